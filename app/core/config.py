@@ -78,6 +78,18 @@ class Settings(BaseSettings):
         default="./configs/model_config.json",
         description="模型配置文件路径"
     )
+    REGEX_ENGINE: str = Field(
+        default="re",
+        description="正则规则匹配引擎：re（标准库）/regex（第三方 regex 模块）/re2（google-re2，线性时间匹配），后两者需单独安装"
+    )
+    REGEX_MATCH_CACHE_SIZE: int = Field(
+        default=4096,
+        description="正则匹配结果缓存的最大条目数（按 文本+领域 缓存，0 表示不缓存）"
+    )
+    REGEX_HYPERSCAN_PREFILTER: bool = Field(
+        default=False,
+        description="是否使用 Hyperscan 预过滤正则规则（需单独安装 hyperscan，规则数量较多时收益明显）"
+    )
     
     # NLU服务配置
     CONFIDENCE_THRESHOLD: float = Field(
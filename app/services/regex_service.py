@@ -3,18 +3,129 @@
 负责加载正则表达式规则并进行匹配
 支持按领域组织的规则文件和可复用的词汇组
 """
+import functools
 import json
+import logging
+import os
 import re
-from typing import Optional, Dict, Any, List
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple, NamedTuple, Callable
 from pathlib import Path
 from app.core.config import settings
 from app.utils.logger import get_logger
-from app.utils.helpers import build_semantic_dict, filter_none_values
+from app.utils.helpers import build_semantic_dict
 from app.services.vocabulary_manager import VocabularyManager
 
+try:
+    import regex  # 可选依赖：第三方 regex 模块（re 的超集）
+except ImportError:
+    regex = None
+
+try:
+    import re2  # 可选依赖：google-re2，线性时间的正则引擎
+except ImportError:
+    re2 = None
+
+try:
+    import orjson  # 可选依赖：orjson，比标准库 json 更快的JSON解析
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick  # 可选依赖：pyahocorasick，用于字面量预过滤
+except ImportError:
+    ahocorasick = None
+
+try:
+    import hyperscan  # 可选依赖：Intel Hyperscan 多模式正则引擎，用于规则预过滤
+except ImportError:
+    hyperscan = None
+
 logger = get_logger(__name__)
 
 
+def _select_regex_engine() -> Any:
+    """
+    按 REGEX_ENGINE 配置选择规则匹配使用的正则引擎
+    
+    Returns:
+        正则模块（re、regex 或 re2），未安装对应模块时回退到标准库 re
+    """
+    if settings.REGEX_ENGINE == "regex" and regex is not None:
+        return regex
+    if settings.REGEX_ENGINE == "re2" and re2 is not None:
+        return re2
+    if settings.REGEX_ENGINE in ("regex", "re2"):
+        logger.warning(
+            "REGEX_ENGINE is '%s' but the %s module is not installed, falling back to re",
+            settings.REGEX_ENGINE, settings.REGEX_ENGINE
+        )
+    return re
+
+
+# 规则匹配使用的正则引擎
+re_mod = _select_regex_engine()
+
+# 会被映射到semantic对象中的实体名
+_SEMANTIC_ENTITY_NAMES = frozenset({"target", "position", "value"})
+
+# 单条规则最多展开的字面量文本数量（超过则不建立查表，避免占用过多内存）
+_MAX_LITERALS_PER_PATTERN = 1000
+
+# 合并规则时将命名分组改写为普通捕获分组（分组编号不变）
+_NAMED_GROUP_RE = re.compile(r'\(\?P<[^>]+>')
+
+# 按编号引用分组的结构（反向引用、条件分组），分组编号改变后会失效
+_GROUP_REFERENCE_RE = re.compile(r'\\[1-9]|\\g<|\(\?P=|\(\?\(')
+
+# 无法安全合并的规则：按编号引用分组（编号会因合并而偏移）或包含全局内联标志
+_UNFUSABLE_RE = re.compile(_GROUP_REFERENCE_RE.pattern + r'|\(\?[aiLmsux]+\)')
+
+# 包含内联标志（如 (?i)）的规则，字面量可能不区分大小写，不参与字面量预过滤
+_INLINE_FLAGS_RE = re.compile(r'\(\?[aiLmsux-]+[:)]')
+
+# Hyperscan 与 re 语义不同的结构：{,n} 量词（Hyperscan 按字面量处理）、\s \w \d \b 等字符类
+# （Unicode 范围与 re 不同）、后行断言、内联标志、条件分组、POSIX 字符类写法
+_HYPERSCAN_UNSAFE_RE = re.compile(r'\{,\d*\}|\\[sSwWdDbB]|\(\?<[=!]|\(\?[aiLmsux-]+[:)]|\(\?\(|\[[:.=]')
+
+# {m,n} 形式的量词
+_BRACE_QUANTIFIER_RE = re.compile(r'\{\d*(?:,\d*)?\}')
+
+# 已解析的JSON配置文件缓存：文件路径 -> ((修改时间, 文件大小), 解析结果)
+_json_file_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+# 参数长度固定的转义序列：转义字母 -> 参数字符数（如 \\x41、\\u6253、\\U0001F600）
+_FIXED_WIDTH_ESCAPES = {"x": 2, "u": 4, "U": 8}
+
+# 正则元字符（出现在分组结构之外时，规则不再是有限的字面量集合）
+_REGEX_META_CHARS = frozenset("\\.*+?[]{}^$|()")
+
+# 纯字面量分支组成的分组，如 "(打开|开启|启动)"、"(?P<target>车窗|车门)"（分支中不含任何元字符和空白）
+_LITERAL_ALTERNATION_RE = re.compile(
+    r'\((\?:|\?P<[^>]+>)?([^\\.*+?\[\]{}^$|()\s#]+(?:\|[^\\.*+?\[\]{}^$|()\s#]+)+)\)'
+)
+
+
+@dataclass(slots=True, frozen=True)
+class PatternEntry:
+    """加载后的一条正则规则：匹配所需的配置字段及加载时预先计算的辅助数据"""
+    pattern: str  # 展开词汇组后的正则表达式
+    compiled: re.Pattern  # 预编译的正则（纯字面量分组已按公共前缀合并）
+    intent: str
+    action: Optional[str]
+    target: Optional[str]
+    domain: Optional[str]
+    confidence: float
+    group_names: Tuple[str, ...]  # 非命名分组按位置对应的实体名（位置指展开后规则中的分组，而非 compiled 中的分组）
+    entity_slots: Tuple[Tuple[int, str, bool], ...]  # compiled 的捕获分组下标到实体名的映射（见 _build_entity_slots、_compact_groups）
+    has_semantic: bool  # 是否可能产生semantic
+    literals: frozenset  # 匹配时必须出现的字面量：每项为一组候选字面量，文本中至少出现其中之一（用于预过滤）
+    pattern_preview: str  # 日志中展示的模式片段
+    original_pattern: Optional[str] = None  # 展开前的原始模式（仅调试模式下记录）
+
+
 def _get_supported_domains() -> List[str]:
     """
     从配置文件读取支持的领域列表（用于正则服务）
@@ -29,31 +140,784 @@ def _get_supported_domains() -> List[str]:
         return []
     
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-            domain_examples = config.get("domain_examples", {})
-            # 返回所有定义的领域名称列表
-            return list(domain_examples.keys())
+        config = _read_json_file(config_path)
+        domain_examples = config.get("domain_examples", {})
+        # 返回所有定义的领域名称列表
+        return list(domain_examples.keys())
     except Exception as e:
         logger.error(f"Failed to load domain list from config: {e}", exc_info=True)
         return []
 
 
+def _read_json_file(path: Path) -> Dict[str, Any]:
+    """
+    读取并解析JSON配置文件（安装了 orjson 时使用 orjson 解析）
+    
+    解析结果按文件路径缓存，文件的修改时间和大小不变时直接返回缓存结果，
+    多次创建服务实例或重新加载时无需重复读取和解析未修改的配置文件。
+    
+    Args:
+        path: 配置文件路径
+    
+    Returns:
+        解析后的配置字典（与缓存共享，调用方不应修改）
+    """
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cache_key = str(path)
+    cached = _json_file_cache.get(cache_key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    
+    if orjson is not None:
+        config = orjson.loads(path.read_bytes())
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    _json_file_cache[cache_key] = (version, config)
+    return config
+
+
+def _intern(value: Any) -> Any:
+    """驻留字符串值（规则间大量重复的 intent/action/domain 等只保留一份），非字符串原样返回"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _compile_rule(pattern: str) -> re.Pattern:
+    """
+    用配置的正则引擎编译单条规则
+    
+    RE2 不支持反向引用、环视等语法，使用 RE2 时这类规则回退到标准库 re 编译。
+    
+    Args:
+        pattern: 正则表达式
+    
+    Returns:
+        编译后的正则表达式
+    
+    Raises:
+        re.error: 规则无效（使用 regex 模块时为 regex.error）
+    """
+    if re_mod is re2:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            logger.debug("Pattern not supported by RE2, compiling with re: %s", pattern[:100])
+            return re.compile(pattern)
+    return re_mod.compile(pattern)
+
+
+def _build_entity_slots(
+    compiled: re.Pattern,
+    group_names: Tuple[str, ...]
+) -> Tuple[Tuple[int, str, bool], ...]:
+    """
+    计算捕获分组到实体名的映射
+    
+    命名分组使用自身名称；所有分组（包括命名分组）还按位置使用 group_names 中的名称，
+    但不覆盖同名的命名分组（同名的位置名称在匹配时取第一个非空值，见 _extract_result）。
+    
+    Args:
+        compiled: 编译后的正则表达式
+        group_names: 规则配置中的分组名称列表
+    
+    Returns:
+        (分组在 match.groups() 中的下标, 实体名, 是否为按位置命名) 元组，按分组顺序排列，只包含有实体名的分组，
+        同一个分组可能同时有命名和按位置的两个实体名
+    """
+    index_to_name = {index: name for name, index in compiled.groupindex.items()}
+    entity_slots = []
+    for i in range(compiled.groups):
+        name = index_to_name.get(i + 1)
+        if name is not None:
+            entity_slots.append((i, name, False))
+        if i < len(group_names) and group_names[i] and group_names[i] not in compiled.groupindex:
+            entity_slots.append((i, group_names[i], True))
+    return tuple(entity_slots)
+
+
+def _compact_groups(
+    compiled: re.Pattern,
+    entity_slots: Tuple[Tuple[int, str, bool], ...]
+) -> Tuple[re.Pattern, Tuple[Tuple[int, str, bool], ...]]:
+    """
+    将没有实体名的捕获分组改为非捕获分组，匹配时不再记录这些分组的位置
+    
+    词汇组展开后的每个分组都是捕获分组，但只有对应实体名的分组会被提取。
+    包含反向引用或条件分组的规则依赖分组编号，保持不变。
+    
+    Args:
+        compiled: 编译后的正则表达式
+        entity_slots: compiled 的分组到实体名的映射（见 _build_entity_slots）
+    
+    Returns:
+        (改写后的正则, 对应改写后分组的实体映射)，无需或无法改写时原样返回
+    """
+    keep = {index + 1 for index, _, _ in entity_slots}
+    if len(keep) == compiled.groups or _GROUP_REFERENCE_RE.search(compiled.pattern):
+        return compiled, entity_slots
+    
+    pattern = compiled.pattern
+    parts = []
+    group_number = 0
+    in_class = False
+    pos = 0
+    while pos < len(pattern):
+        char = pattern[pos]
+        if char == "\\":
+            parts.append(pattern[pos:pos + 2])
+            pos += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            # 字符类开头的 ] 或 ^] 是普通字符
+            end = pos + 1
+            if pattern.startswith("^", end):
+                end += 1
+            if pattern.startswith("]", end):
+                end += 1
+            parts.append(pattern[pos:end])
+            pos = end
+            continue
+        elif char == "(":
+            if not pattern.startswith("?", pos + 1):
+                group_number += 1
+                if group_number not in keep:
+                    parts.append("(?:")
+                    pos += 1
+                    continue
+            elif pattern.startswith("?P<", pos + 1) or (
+                pattern.startswith("?<", pos + 1) and not pattern.startswith(("?<=", "?<!"), pos + 1)
+            ):
+                # 命名分组（始终有实体名，保留）
+                group_number += 1
+        parts.append(char)
+        pos += 1
+    
+    try:
+        compacted = _compile_rule("".join(parts))
+    except (re_mod.error, re.error):
+        return compiled, entity_slots
+    if compacted.groups != len(keep):
+        return compiled, entity_slots
+    # 保留的分组按原顺序重新编号
+    renumber = {number - 1: index for index, number in enumerate(sorted(keep))}
+    return compacted, tuple((renumber[index], name, positional) for index, name, positional in entity_slots)
+
+
+def _enumerate_literals(pattern: str) -> List[str]:
+    """
+    枚举纯字面量规则能匹配的所有文本
+    
+    只支持由字面量字符、分组（捕获/非捕获/命名）、分组内的 | 以及 ? 组成的模式，
+    如 "(下一首|上一首)"、"(?:(接听|拒接)|(挂断|回拨))(电话)?"。
+    
+    Args:
+        pattern: 展开后的正则表达式
+    
+    Returns:
+        字面量文本列表，规则不是纯字面量形式或文本数量超出上限时返回空列表
+    """
+    try:
+        literals, pos = _parse_literal_alternation(pattern, 0)
+    except ValueError:
+        return []
+    if pos != len(pattern):
+        return []
+    return list(dict.fromkeys(literals))
+
+
+def _parse_literal_alternation(pattern: str, pos: int) -> Tuple[List[str], int]:
+    """解析 "序列|序列|..."，返回所有可能文本及结束位置"""
+    literals, pos = _parse_literal_sequence(pattern, pos)
+    while pos < len(pattern) and pattern[pos] == "|":
+        branch, pos = _parse_literal_sequence(pattern, pos + 1)
+        literals += branch
+        if len(literals) > _MAX_LITERALS_PER_PATTERN:
+            raise ValueError("too many literals")
+    return literals, pos
+
+
+def _parse_literal_sequence(pattern: str, pos: int) -> Tuple[List[str], int]:
+    """解析由字面量字符和分组组成的序列，返回所有可能文本及结束位置"""
+    literals = [""]
+    while pos < len(pattern) and pattern[pos] not in "|)":
+        char = pattern[pos]
+        if char == "(":
+            if pattern.startswith("(?:", pos):
+                pos += 3
+            elif pattern.startswith("(?P<", pos):
+                pos = pattern.index(">", pos) + 1
+            elif pattern.startswith("(?", pos):
+                raise ValueError("unsupported group")
+            else:
+                pos += 1
+            options, pos = _parse_literal_alternation(pattern, pos)
+            if pos >= len(pattern) or pattern[pos] != ")":
+                raise ValueError("unbalanced group")
+            pos += 1
+        elif char in _REGEX_META_CHARS:
+            raise ValueError("not a literal pattern")
+        else:
+            options = [char]
+            pos += 1
+        
+        # 只支持 ? 量词（可选）
+        if pos < len(pattern) and pattern[pos] == "?":
+            options = [""] + options
+            pos += 1
+        
+        literals = [prefix + option for prefix in literals for option in options]
+        if len(literals) > _MAX_LITERALS_PER_PATTERN:
+            raise ValueError("too many literals")
+    return literals, pos
+
+
+def _escape_end(pattern: str, pos: int) -> int:
+    """
+    返回从 pos（反斜杠位置）开始的转义序列的结束位置
+    
+    转义序列的参数部分（如 \\u6253 中的 6253、\\N{DIGIT ONE} 中的名称）不是文本中出现的字面量。
+    
+    Args:
+        pattern: 正则表达式
+        pos: 反斜杠的位置
+    
+    Returns:
+        转义序列之后第一个字符的位置
+    """
+    kind = pattern[pos + 1:pos + 2]
+    end = pos + 2
+    if kind in _FIXED_WIDTH_ESCAPES:
+        return min(end + _FIXED_WIDTH_ESCAPES[kind], len(pattern))
+    if kind in "NpPg" and pattern.startswith(("{", "<"), end):
+        # \N{名称}、\p{属性}、\g<分组>
+        close = pattern.find("}" if pattern[end] == "{" else ">", end)
+        return len(pattern) if close < 0 else close + 1
+    if kind in "pP":
+        # regex 模块的单字母属性简写，如 \pL
+        return min(end + 1, len(pattern))
+    if kind.isdigit():
+        # 八进制转义（\0nn、\nnn）或分组引用（\1、\12）
+        digits = end
+        while digits < len(pattern) and digits - pos < 4 and pattern[digits].isdigit():
+            digits += 1
+        return digits
+    return end
+
+
+def _extract_required_literals(pattern: str) -> frozenset:
+    """
+    提取规则匹配时必须出现在文本中的字面量片段（保守估计）
+    
+    收集顶层（分组和字符类之外）的连续字面量字符，以及顶层的纯字面量分组
+    （如词汇组展开得到的 "(打开|开启|启动)"，文本中至少出现其中一个分支）；
+    带有 ?、*、{m,n} 量词的字符和可省略的分组不计入，其余花括号视为片段分隔。
+    顶层存在 | 或包含内联标志时无法确定，返回空集合。
+    
+    Args:
+        pattern: 展开后的正则表达式
+    
+    Returns:
+        候选字面量集合的集合（每个集合中至少有一个出现在文本中），空集合表示不做预过滤
+    """
+    if _INLINE_FLAGS_RE.search(pattern):
+        return frozenset()
+    
+    literals = set()
+    alternations = set()
+    run = []
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            # 转义序列（可能是 \d 等字符类），整个序列都不计入字面量
+            if run:
+                literals.add("".join(run))
+                run = []
+            i = _escape_end(pattern, i)
+            continue
+        
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            # 字符类开头的 ^ 和 ] 都不结束字符类
+            if pattern.startswith("^", i + 1):
+                i += 1
+            if pattern.startswith("]", i + 1):
+                i += 1
+        elif char == "(":
+            alternation = _LITERAL_ALTERNATION_RE.match(pattern, i) if depth == 0 else None
+            if alternation:
+                # 顶层纯字面量分组：分组不可省略时至少出现其中一个分支
+                end = alternation.end()
+                if not (pattern.startswith(("?", "*", "{0", "{,"), end)):
+                    alternations.add(frozenset(alternation.group(2).split("|")))
+                i = end - 1
+            else:
+                depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0:
+            if char == "|":
+                return frozenset()
+            quantifier = _BRACE_QUANTIFIER_RE.match(pattern, i) if char == "{" else None
+            if char in "?*" or quantifier:
+                # 量词作用于前一个字符，该字符不是必须的
+                if run:
+                    run.pop()
+                if quantifier:
+                    i = quantifier.end() - 1
+            elif char not in _REGEX_META_CHARS and char != "}":
+                run.append(char)
+                i += 1
+                continue
+        
+        if run:
+            literals.add("".join(run))
+            run = []
+        i += 1
+    
+    if run:
+        literals.add("".join(run))
+    required = {frozenset((literal,)) for literal in literals if literal}
+    required.update(alternations)
+    return frozenset(required)
+
+
+def _factor_alternations(pattern: str) -> str:
+    """
+    将模式中的纯字面量分组按公共前缀合并（trie 化），减少正则引擎逐个分支回溯的次数
+    
+    如 "(打开|开启|启动)(?P<target>车窗|车门|天窗)" 改写为 "(打开|开启|启动)(?P<target>车[窗门]|天窗)"。
+    分组的捕获编号、名称以及各分支的尝试顺序（第一个能使整体匹配成功的分支优先）都保持不变，
+    因此匹配结果与改写前完全一致。包含内联标志（如 (?i)、(?x)）的模式不改写。
+    
+    Args:
+        pattern: 展开后的正则表达式
+    
+    Returns:
+        改写后的正则表达式
+    """
+    if _INLINE_FLAGS_RE.search(pattern):
+        return pattern
+    
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            parts.append(pattern[i:i + 2])
+            i += 2
+            continue
+        
+        if char == "[":
+            # 字符类原样保留（其中的括号和 | 都是普通字符）
+            end = i + 1
+            if pattern.startswith("^", end):
+                end += 1
+            if pattern.startswith("]", end):
+                end += 1
+            while end < len(pattern) and pattern[end] != "]":
+                end += 2 if pattern[end] == "\\" else 1
+            parts.append(pattern[i:end + 1])
+            i = end + 1
+            continue
+        
+        match = _LITERAL_ALTERNATION_RE.match(pattern, i) if char == "(" else None
+        if match:
+            prefix, body = match.groups()
+            alternatives = list(dict.fromkeys(body.split("|")))
+            parts.append("(" + (prefix or "") + "|".join(_factor_alternatives(alternatives)) + ")")
+            i = match.end()
+            continue
+        
+        parts.append(char)
+        i += 1
+    return "".join(parts)
+
+
+def _factor_exclusive_run(run: List[str]) -> List[str]:
+    """将一段连续的非空字面量分支按首字符合并（不同首字符的分支互斥，可任意调整相对顺序）"""
+    by_first_char: Dict[str, List[str]] = {}
+    for item in run:
+        by_first_char.setdefault(item[0], []).append(item[1:])
+    
+    branches = []
+    single_chars = []
+    for first_char, suffixes in by_first_char.items():
+        if suffixes == [""]:
+            single_chars.append(first_char)
+            continue
+        if len(suffixes) == 1:
+            branches.append(first_char + suffixes[0])
+            continue
+        
+        rest = _factor_alternatives(suffixes)
+        if len(rest) == 1:
+            branches.append(first_char + rest[0])
+        elif rest[-1] == "":
+            # 空分支排在最后：先尝试较长的分支，等价于贪婪的可选分组
+            branches.append(first_char + _optional_group(rest[:-1]) + "?")
+        elif rest[0] == "":
+            # 空分支排在最前：先尝试空分支，等价于非贪婪的可选分组
+            branches.append(first_char + _optional_group(rest[1:]) + "??")
+        else:
+            branches.append(first_char + "(?:" + "|".join(rest) + ")")
+    
+    # 多个单字符分支合并为字符类
+    if len(single_chars) > 1:
+        branches.insert(0, "[" + "".join(re.escape(char) for char in single_chars) + "]")
+    else:
+        branches = single_chars + branches
+    return branches
+
+
+def _optional_group(branches: List[str]) -> str:
+    """生成可直接添加 ? 量词的分组（单字符或单个字符类无需再加分组）"""
+    if len(branches) == 1 and (len(branches[0]) == 1 or re.fullmatch(r'\[[^\[\]]+\]', branches[0])):
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+def _factor_alternatives(alternatives: List[str]) -> List[str]:
+    """
+    将按顺序排列的字面量分支合并为等价的 trie 形式分支列表
+    
+    首字符不同的分支在同一位置互斥，调整它们的相对顺序不影响匹配结果，
+    因此可以按首字符分组；空分支（已匹配完公共前缀）与其他分支不互斥，保持原有位置。
+    
+    Args:
+        alternatives: 去重后的字面量分支（可包含空字符串）
+    
+    Returns:
+        合并后的分支列表，用 | 连接即为等价的正则
+    """
+    factored = []
+    run = []
+    # 末尾的 None 用于处理最后一段连续的非空分支
+    for alternative in alternatives + [None]:
+        if alternative:
+            run.append(alternative)
+            continue
+        
+        if run:
+            factored.extend(_factor_exclusive_run(run))
+            run = []
+        if alternative is not None:
+            factored.append(alternative)
+    return factored
+
+
+def _warn_backtracking(pattern: str) -> bool:
+    """
+    静态检查规则中容易引起灾难性回溯的结构，命中时记录警告
+    
+    检查项：
+    - 无上限量词作用于包含可变长量词的分组，如 "(a+)+"、"(.*)*"、"(a?)+"
+    - 无上限量词作用于包含 | 的分组，如 "(a|ab)+"
+    - 同一规则中出现多个 .+ / .*（多个无界通配相邻时匹配失败代价随文本长度多项式增长）
+    
+    单个 .+ 以及 ?、{m,n} 这类有上限的量词作用的分组不会引起指数级回溯，不做提示。
+    
+    Args:
+        pattern: 展开后的正则表达式
+    
+    Returns:
+        存在回溯风险时返回True
+    """
+    risks = []
+    # 每层分组的状态：[是否包含可变长量词, 是否包含 |]
+    stack = [[False, False]]
+    dot_wildcards = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "(":
+            stack.append([False, False])
+            # 跳过 (?:、(?P<name> 等分组前缀
+            if pattern.startswith("(?P<", i):
+                i = pattern.find(">", i) + 1 or len(pattern)
+            elif pattern.startswith("(?", i):
+                i += 3
+            else:
+                i += 1
+            continue
+        if char == "|":
+            stack[-1][1] = True
+            i += 1
+            continue
+        
+        # 读取一个原子（转义字符、字符类、分组结束或普通字符），随后检查作用于它的量词
+        inner = None
+        if char == "\\":
+            i += 2
+        elif char == "[":
+            i += 1
+            if pattern.startswith("^", i):
+                i += 1
+            if pattern.startswith("]", i):
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+        elif char == ")" and len(stack) > 1:
+            inner = stack.pop()
+            i += 1
+        else:
+            i += 1
+        
+        quantifier, i = _read_quantifier(pattern, i)
+        if inner is not None:
+            if quantifier == "unbounded" and inner[0]:
+                risks.append("nested quantifiers")
+            elif quantifier == "unbounded" and inner[1]:
+                risks.append("unbounded quantifier over alternation")
+            stack[-1][0] = stack[-1][0] or inner[0]
+        if quantifier:
+            stack[-1][0] = True
+            if quantifier == "unbounded" and char == ".":
+                dot_wildcards += 1
+    
+    if dot_wildcards > 1:
+        risks.append(f"{dot_wildcards} unbounded wildcards (.+/.*)")
+    
+    for risk in dict.fromkeys(risks):
+        logger.warning(f"Regex pattern may backtrack catastrophically ({risk}): {pattern[:100]}...")
+    return bool(risks)
+
+
+def _read_quantifier(pattern: str, pos: int) -> Tuple[Optional[str], int]:
+    """
+    读取 pattern[pos] 处的量词
+    
+    Returns:
+        ("unbounded"（*、+、{n,}）/ "bounded"（?、{m,n}）/ None（无量词或 {n}）, 量词之后的位置)
+    """
+    if pos >= len(pattern):
+        return None, pos
+    char = pattern[pos]
+    if char in "*+?":
+        kind = "bounded" if char == "?" else "unbounded"
+        pos += 1
+    elif char == "{" and _BRACE_QUANTIFIER_RE.match(pattern, pos):
+        quantifier = _BRACE_QUANTIFIER_RE.match(pattern, pos).group()
+        pos += len(quantifier)
+        if quantifier.endswith(",}"):
+            kind = "unbounded"
+        elif "," in quantifier:
+            kind = "bounded"
+        else:
+            kind = None
+    else:
+        return None, pos
+    
+    # 非贪婪/占有量词后缀
+    if pos < len(pattern) and pattern[pos] in "?+":
+        pos += 1
+    return kind, pos
+
+
+def _build_literal_prefilter(
+    patterns: List[PatternEntry]
+) -> Optional[Tuple[Optional[Any], List[frozenset], Tuple[int, ...]]]:
+    """
+    为一组规则构建字面量预过滤器
+    
+    安装了 pyahocorasick 时把所有规则的字面量建成一个 Aho-Corasick 自动机，
+    每个字面量对应它所满足的 (规则下标, 候选集合序号)，一次扫描文本即可直接得到候选规则，
+    无需逐条规则检查；否则逐条规则用 in（C 实现的子串查找）检查。
+    
+    Args:
+        patterns: 规则列表
+    
+    Returns:
+        (自动机或None, 每条规则必须出现的候选字面量集合, 没有字面量要求的规则下标)，
+        没有可用字面量时返回None
+    """
+    required = [pattern_config.literals for pattern_config in patterns]
+    if not any(required):
+        return None
+    always = tuple(index for index, literals in enumerate(required) if not literals)
+    if ahocorasick is None:
+        return None, required, always
+    
+    owners: Dict[str, List[Tuple[int, int]]] = {}
+    for index, literals in enumerate(required):
+        for group_index, group in enumerate(literals):
+            for literal in group:
+                owners.setdefault(literal, []).append((index, group_index))
+    
+    automaton = ahocorasick.Automaton()
+    for literal, keys in owners.items():
+        automaton.add_word(literal, tuple(keys))
+    automaton.make_automaton()
+    return automaton, required, always
+
+
+def _build_hyperscan_prefilter(
+    patterns: List[PatternEntry]
+) -> Optional[Tuple[Any, frozenset, threading.local]]:
+    """
+    为一组规则构建 Hyperscan 预过滤数据库，一次扫描即可得到文本中可能命中的所有规则
+    
+    Hyperscan 不支持捕获分组，只用来确定候选规则，命中后仍由 re 按规则顺序匹配并提取分组。
+    Hyperscan 的语法和语义与 re 并不完全一致：包含语义不同的结构（见 _HYPERSCAN_UNSAFE_RE）的规则
+    不交给 Hyperscan，始终作为候选；其余规则无法精确编译时以 HS_FLAG_PREFILTER 模式编译（只会多报），
+    仍然无法编译的规则（如可以匹配空串的规则）同样始终作为候选。
+    预过滤依赖 Hyperscan 对所编译结构的解释与 re 一致，规则中用到上述以外的特殊语法时需自行确认。
+    
+    Args:
+        patterns: 规则列表
+    
+    Returns:
+        (数据库, 始终作为候选的规则下标集合, 线程本地的 scratch 存储)，
+        未启用 REGEX_HYPERSCAN_PREFILTER、未安装 hyperscan 或没有可编译的规则时返回None
+    """
+    if not settings.REGEX_HYPERSCAN_PREFILTER:
+        return None
+    if hyperscan is None:
+        logger.warning("REGEX_HYPERSCAN_PREFILTER is enabled but hyperscan is not installed, skipping")
+        return None
+    
+    base_flags = hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP | hyperscan.HS_FLAG_SINGLEMATCH
+    expressions = []
+    ids = []
+    flags = []
+    always = set()
+    for index, pattern_config in enumerate(patterns):
+        if _HYPERSCAN_UNSAFE_RE.search(pattern_config.compiled.pattern):
+            always.add(index)
+            continue
+        expression = pattern_config.compiled.pattern.encode("utf-8")
+        for pattern_flags in (base_flags, base_flags | hyperscan.HS_FLAG_PREFILTER):
+            try:
+                hyperscan.Database().compile(expressions=[expression], ids=[index], flags=[pattern_flags])
+            except hyperscan.error:
+                continue
+            expressions.append(expression)
+            ids.append(index)
+            flags.append(pattern_flags)
+            break
+        else:
+            always.add(index)
+    
+    if not expressions:
+        return None
+    
+    database = hyperscan.Database()
+    database.compile(expressions=expressions, ids=ids, flags=flags)
+    # scratch 不能被多个线程同时使用，每个线程各自持有一份
+    local = threading.local()
+    local.scratch = hyperscan.Scratch(database)
+    return database, frozenset(always), local
+
+
+def _on_hyperscan_match(index: int, start: int, end: int, flags: int, matched: set):
+    """Hyperscan 命中回调：记录命中的规则下标"""
+    matched.add(index)
+
+
+def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """复制预先构建的匹配结果，避免调用方修改共享的模板"""
+    copied = result.copy()
+    if copied["semantic"]:
+        copied["semantic"] = copied["semantic"].copy()
+    if copied["entities"]:
+        copied["entities"] = copied["entities"].copy()
+    return copied
+
+
+def _build_fused_pattern(
+    patterns: List[PatternEntry]
+) -> Optional[Tuple[re.Pattern, Dict[int, Tuple[int, int, int]]]]:
+    """
+    将一组规则合并为一个正则表达式，一次调用即可得到第一个命中的规则
+    
+    每个规则包装为 (?=(?s:.*?)(规则)) 形式的前瞻分支，合并后的表达式在文本开头匹配：
+    分支按规则顺序尝试，每个分支都在整段文本中查找该规则最左侧的匹配，
+    因此与逐条执行 search 的"第一条命中的规则优先"语义一致。
+    
+    Args:
+        patterns: 规则列表
+    
+    Returns:
+        (合并后的正则, 包装分组编号 -> (规则下标, 分组起始下标, 分组结束下标))，
+        规则少于两条或无法安全合并时返回None
+    """
+    # RE2 不支持合并所需的前瞻，使用 RE2 时不合并，由字面量预过滤缩小逐条匹配的范围
+    if len(patterns) < 2 or re_mod is re2:
+        return None
+    
+    branches = []
+    spans = {}
+    group_index = 0
+    for index, pattern_config in enumerate(patterns):
+        # 使用实际编译的模式（纯字面量分组已合并，见 _factor_alternations）
+        pattern = pattern_config.compiled.pattern
+        if _UNFUSABLE_RE.search(pattern):
+            return None
+        
+        # 命名分组改为普通分组，避免不同规则之间的分组名冲突
+        branch = _NAMED_GROUP_RE.sub("(", pattern)
+        group_count = pattern_config.compiled.groups
+        
+        # 包装分组编号为 group_index，规则自身的分组对应 match.groups()[group_index:group_index + group_count]
+        group_index += 1
+        spans[group_index] = (index, group_index, group_index + group_count)
+        group_index += group_count
+        branches.append(f"(?=(?s:.*?)({branch}))")
+    
+    # 只编译一次合并后的表达式：分组总数与各规则分组数之和一致，说明改写没有破坏任何规则的分组结构
+    try:
+        fused = re_mod.compile("(?:" + "|".join(branches) + ")")
+    except re_mod.error:
+        return None
+    if fused.groups != group_index:
+        return None
+    return fused, spans
+
+
+class _RuleSet(NamedTuple):
+    """一次匹配依次尝试的全部规则（领域规则在前、通用规则兜底）及其加载时构建的匹配辅助结构"""
+    patterns: List[PatternEntry]  # 规则列表
+    fallback_start: int  # 通用规则在 patterns 中的起始下标（之前为领域规则）
+    searches: Tuple[Callable[[str], Optional[re.Match]], ...]  # 各规则编译后正则的 search 方法（与 patterns 一一对应）
+    literal_table: Dict[str, Tuple[int, Dict[str, Any]]]  # 纯字面量规则查表（见 _build_literal_table）
+    fused: Optional[Tuple[re.Pattern, Dict[int, Tuple[int, int, int]]]]  # 合并正则（见 _build_fused_pattern）
+    prefilter: Optional[Tuple[Optional[Any], List[frozenset], Tuple[int, ...]]]  # 字面量预过滤器（见 _build_literal_prefilter）
+    scanner: Optional[Tuple[Any, frozenset, threading.local]]  # Hyperscan 预过滤器（见 _build_hyperscan_prefilter）
+
+
 class RegexService:
     """正则匹配服务类"""
     
     def __init__(self):
-        self.domain_patterns: Dict[str, List[Dict[str, Any]]] = {}  # 按领域组织的规则
-        self.common_patterns: List[Dict[str, Any]] = []  # 通用规则（向后兼容）
+        self.domain_patterns: Dict[str, List[PatternEntry]] = {}  # 按领域组织的规则
+        self.common_patterns: List[PatternEntry] = []  # 通用规则（向后兼容）
         self.vocab_manager: Optional[VocabularyManager] = None  # 词汇组管理器
+        # 各领域的规则组：领域（全局匹配为None） -> 规则组，领域规则首次使用时加载
+        self._dispatch: Dict[Optional[str], _RuleSet] = {}
+        self._domain_files: Dict[str, Path] = {}  # 尚未加载的领域规则文件
+        self._domain_lock = threading.Lock()  # 保证每个领域的规则只加载一次
+        # 匹配结果缓存（启用 REGEX_MATCH_CACHE_SIZE 时由 load_patterns 创建），规则加载后需清空
+        self._match_cached: Optional[Callable[[str, Optional[str]], Optional[Dict[str, Any]]]] = None
         self._loaded = False
     
     def load_patterns(self):
-        """从配置文件加载正则表达式模式"""
+        """从配置文件加载词汇组和通用规则，领域规则在首次匹配该领域时加载"""
         if self._loaded:
             return
         
         logger.info("Loading regex patterns...")
+        self.clear_cache()
         
         # 0. 加载词汇组管理器（必须在加载模式之前）
         try:
@@ -64,24 +928,46 @@ class RegexService:
             logger.warning(f"Failed to load vocabulary manager: {e}, continuing without vocabulary groups")
             self.vocab_manager = None
         
-        # 1. 加载领域特定的规则文件
-        self._load_domain_patterns()
+        # 1. 查找领域特定的规则文件（规则在该领域首次匹配时才加载，见 _ensure_domain_loaded）
+        self._find_domain_files()
         
         # 2. 加载通用规则文件（向后兼容）
         self._load_common_patterns()
         
-        # 统计信息
-        total_patterns = sum(len(patterns) for patterns in self.domain_patterns.values())
-        total_patterns += len(self.common_patterns)
+        # 3. 全局匹配（domain=None）和未知领域只匹配通用规则；指定领域时先匹配该领域规则，再用通用规则兜底
+        self._dispatch = {None: self._build_rule_set(self.common_patterns, fallback_start=0)}
         
-        logger.info(f"Loaded {total_patterns} regex patterns")
-        logger.info(f"  - Domain-specific: {len(self.domain_patterns)} domains, {sum(len(p) for p in self.domain_patterns.values())} patterns")
+        logger.info(f"Found {len(self._domain_files)} domain regex files (loaded on first use)")
         logger.info(f"  - Common patterns: {len(self.common_patterns)} patterns")
         
         self._loaded = True
+        # 加载完成后直接使用不带加载状态检查的实现；启用缓存时相同的 (文本, 领域) 直接返回缓存结果
+        self.match = self._match_loaded
+        if settings.REGEX_MATCH_CACHE_SIZE > 0:
+            self._match_cached = functools.lru_cache(maxsize=settings.REGEX_MATCH_CACHE_SIZE)(self._match_loaded)
+            self.match = self._match_with_cache
+    
+    def reload_patterns(self):
+        """重新加载词汇组和全部规则（领域规则在下次匹配该领域时重新加载），并清空匹配结果缓存"""
+        with self._domain_lock:
+            # 重新加载期间使用未加载时的 match 实现
+            vars(self).pop("match", None)
+            self._loaded = False
+            self.clear_cache()
+            self.domain_patterns = {}
+            self.common_patterns = []
+            self._dispatch = {}
+            self._domain_files = {}
+        self.load_patterns()
+    
+    def clear_cache(self):
+        """清空匹配结果缓存"""
+        if self._match_cached is not None:
+            self._match_cached.cache_clear()
+            logger.debug("Regex match cache cleared")
     
-    def _load_domain_patterns(self):
-        """加载领域特定的规则文件"""
+    def _find_domain_files(self):
+        """按配置中的领域顺序查找存在的领域规则文件"""
         domain_dir = Path(settings.REGEX_DOMAIN_DIR)
         
         if not domain_dir.exists():
@@ -89,31 +975,68 @@ class RegexService:
             self._create_default_domain_configs(domain_dir)
             return
         
-        supported_domains = _get_supported_domains()
-        for domain in supported_domains:
-            domain_file = domain_dir / f"{domain}.json"
-            
-            if domain_file.exists():
-                try:
-                    with open(domain_file, 'r', encoding='utf-8') as f:
-                        config = json.load(f)
-                        patterns = config.get("patterns", [])
-                        
-                        if patterns:
-                            # 展开词汇组引用
-                            expanded_patterns = self._expand_patterns(patterns)
-                            # 为每个规则添加文件级别的domain（如果规则本身没有domain字段）
-                            for pattern_config in expanded_patterns:
-                                if "domain" not in pattern_config:
-                                    pattern_config["domain"] = domain
-                            self.domain_patterns[domain] = expanded_patterns
-                            logger.debug(f"Loaded {len(expanded_patterns)} patterns for domain: {domain}")
-                except Exception as e:
-                    logger.error(f"Failed to load regex patterns for domain '{domain}': {e}")
-                    continue
+        # 一次目录扫描列出所有规则文件，避免逐个领域 stat
+        with os.scandir(domain_dir) as entries:
+            available_files = {
+                entry.name[:-len(".json")]: Path(entry.path)
+                for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            }
+        
+        for domain in _get_supported_domains():
+            domain_file = available_files.get(domain)
+            if domain_file:
+                self._domain_files[domain] = domain_file
             else:
                 logger.debug(f"No regex file found for domain: {domain}")
     
+    def _ensure_domain_loaded(self, domain: Optional[str]) -> _RuleSet:
+        """
+        确保领域规则已加载，返回该领域的规则组
+        
+        领域规则与通用规则合并为同一个规则组（领域规则在前），一次匹配即可完成领域匹配和通用规则兜底。
+        
+        Args:
+            domain: 领域名称
+        
+        Returns:
+            规则组，没有对应规则文件的领域只使用通用规则
+        """
+        rule_set = self._dispatch.get(domain)
+        if rule_set is not None:
+            return rule_set
+        if domain not in self._domain_files:
+            return self._dispatch[None]
+        
+        with self._domain_lock:
+            # 其他线程可能已经完成加载
+            rule_set = self._dispatch.get(domain)
+            if rule_set is not None:
+                return rule_set
+            
+            rule_set = self._dispatch[None]
+            try:
+                config = _read_json_file(self._domain_files[domain])
+                patterns = config.get("patterns", [])
+                
+                if patterns:
+                    # 展开词汇组引用（规则本身没有domain字段时使用文件级别的domain）
+                    expanded_patterns = self._expand_patterns(patterns, default_domain=domain)
+                    self.domain_patterns[domain] = expanded_patterns
+                    rule_set = self._build_rule_set(
+                        expanded_patterns + self.common_patterns,
+                        fallback_start=len(expanded_patterns)
+                    )
+                    logger.info(f"Loaded {len(expanded_patterns)} patterns for domain: {domain}")
+            except Exception as e:
+                logger.error(f"Failed to load regex patterns for domain '{domain}': {e}")
+            
+            # 加载失败的领域同样只使用通用规则，不再重复尝试
+            self._dispatch[domain] = rule_set
+            # 该领域的规则组已改变，清空匹配结果缓存
+            self.clear_cache()
+            return rule_set
+    
     def _load_common_patterns(self):
         """加载通用规则文件（向后兼容）"""
         config_path = Path(settings.REGEX_CONFIG_PATH)
@@ -123,56 +1046,145 @@ class RegexService:
             return
         
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                patterns = config.get("patterns", [])
-                
-                if patterns:
-                    # 展开词汇组引用
-                    self.common_patterns = self._expand_patterns(patterns)
-                    logger.info(f"Loaded {len(self.common_patterns)} common patterns from {config_path}")
+            config = _read_json_file(config_path)
+            patterns = config.get("patterns", [])
+            
+            if patterns:
+                # 展开词汇组引用（规则本身没有domain字段时归为"通用"领域）
+                self.common_patterns = self._expand_patterns(patterns, default_domain="通用")
+                logger.info(f"Loaded {len(self.common_patterns)} common patterns from {config_path}")
         except Exception as e:
             logger.warning(f"Failed to load common regex patterns: {e}")
     
-    def _expand_patterns(self, patterns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _expand_patterns(
+        self,
+        patterns: List[Dict[str, Any]],
+        default_domain: Optional[str] = None
+    ) -> List[PatternEntry]:
         """
-        展开模式中的词汇组引用
+        展开模式中的词汇组引用，并构建只包含匹配所需字段的规则
         
         Args:
             patterns: 原始模式配置列表
+            default_domain: 规则本身没有domain字段时使用的领域（如规则文件所属领域）
             
         Returns:
-            展开后的模式配置列表
+            展开后的规则列表
         """
-        if not self.vocab_manager:
-            # 如果没有词汇组管理器，直接返回原始模式（向后兼容）
-            return patterns
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         
         expanded = []
         for pattern_config in patterns:
-            expanded_config = pattern_config.copy()
             original_pattern = pattern_config.get("pattern", "")
+            if not original_pattern:
+                continue
             
-            if original_pattern:
-                # 展开词汇组引用
+            expanded_pattern = original_pattern
+            debug_original_pattern = None
+            
+            # 展开词汇组引用（没有词汇组管理器时保持原始模式，向后兼容）
+            if self.vocab_manager:
                 expanded_pattern = self.vocab_manager.expand_pattern(original_pattern)
-                expanded_config["pattern"] = expanded_pattern
                 
-                # 记录原始模式（用于调试）
-                if expanded_pattern != original_pattern:
-                    expanded_config["_original_pattern"] = original_pattern
+                # 记录原始模式（仅用于调试）
+                if debug_enabled and expanded_pattern != original_pattern:
+                    debug_original_pattern = original_pattern
                     logger.debug(f"Expanded pattern: {original_pattern[:100]}... -> {expanded_pattern[:200]}...")
-                
-                # 验证展开后的正则表达式是否有效
-                try:
-                    re.compile(expanded_pattern)
-                except re.error as e:
-                    logger.error(f"Invalid expanded regex pattern: {expanded_pattern[:200]}... Error: {e}")
             
-            expanded.append(expanded_config)
+            # 加载时预编译正则表达式（纯字面量分组先按公共前缀合并），匹配时直接使用编译结果；无效的规则直接跳过
+            # 注：规则按 str 匹配而不是 UTF-8 bytes——bytes 模式下 [窗门] 等中文字符类会按单个字节匹配，
+            # 且在默认规则上实测各领域都比 str 慢约一倍
+            try:
+                compiled = _compile_rule(_factor_alternations(expanded_pattern))
+            except (re_mod.error, re.error) as e:
+                logger.error(f"Invalid expanded regex pattern: {expanded_pattern[:200]}... Error: {e}")
+                continue
+            
+            # 加载时提示可能引起灾难性回溯的规则
+            _warn_backtracking(expanded_pattern)
+            
+            # 取值较少、在规则间大量重复的字段驻留为同一个字符串对象
+            action = _intern(pattern_config.get("action"))
+            target = _intern(pattern_config.get("target"))
+            group_names = tuple(_intern(name) for name in pattern_config.get("group_names", []))
+            # 预先计算分组到实体名的映射
+            entity_slots = _build_entity_slots(compiled, group_names)
+            # 没有实体名的分组改为非捕获分组
+            compiled, entity_slots = _compact_groups(compiled, entity_slots)
+            
+            expanded.append(PatternEntry(
+                pattern=expanded_pattern,
+                compiled=compiled,
+                intent=_intern(pattern_config.get("intent", "unknown")),
+                action=action,
+                target=target,
+                domain=_intern(pattern_config.get("domain") or default_domain),
+                confidence=pattern_config.get("confidence", 1.0),
+                group_names=group_names,
+                entity_slots=entity_slots,
+                # 是否可能产生semantic：配置了action/target，或存在target/position/value实体分组
+                has_semantic=bool(action or target or _SEMANTIC_ENTITY_NAMES.intersection(name for _, name, _ in entity_slots)),
+                # 匹配时必须出现的字面量（用于预过滤）
+                literals=_extract_required_literals(expanded_pattern),
+                # 预先截取日志中展示的模式片段，避免每次命中时切片
+                pattern_preview=expanded_pattern[:100],
+                original_pattern=debug_original_pattern
+            ))
         
         return expanded
     
+    def _build_rule_set(self, patterns: List[PatternEntry], fallback_start: int) -> _RuleSet:
+        """
+        构建一组规则的匹配辅助结构
+        
+        Args:
+            patterns: 规则列表（领域规则在前，通用规则在后）
+            fallback_start: 通用规则在 patterns 中的起始下标
+        
+        Returns:
+            规则组
+        """
+        fused = _build_fused_pattern(patterns)
+        return _RuleSet(
+            patterns=patterns,
+            fallback_start=fallback_start,
+            searches=tuple(pattern_config.compiled.search for pattern_config in patterns),
+            literal_table=self._build_literal_table(patterns),
+            fused=fused,
+            # 没有 Aho-Corasick 时逐条 in 检查比合并正则一次 match 更慢，只在无法合并时才使用
+            prefilter=_build_literal_prefilter(patterns) if fused is None or ahocorasick is not None else None,
+            scanner=_build_hyperscan_prefilter(patterns)
+        )
+    
+    def _build_literal_table(
+        self,
+        patterns: List[PatternEntry]
+    ) -> Dict[str, Tuple[int, Dict[str, Any]]]:
+        """
+        为纯字面量规则（如 "(下一首|上一首|暂停)"、"(接听|挂断)(电话)?"）构建 文本 -> 匹配结果 的查表
+        
+        结果模板由规则本身对该文本匹配得到，与走正则引擎的结果一致。
+        同一文本被多个规则覆盖时保留靠前的规则。
+        
+        Args:
+            patterns: 规则列表
+        
+        Returns:
+            文本到 (规则下标, 结果模板) 的映射
+        """
+        table = {}
+        for index, pattern_config in enumerate(patterns):
+            for literal in _enumerate_literals(pattern_config.pattern):
+                if literal in table:
+                    continue
+                match = pattern_config.compiled.search(literal)
+                if match:
+                    table[literal] = (index, self._extract_result(pattern_config, match.groups(), literal))
+        
+        if table:
+            logger.debug(f"Built literal lookup table with {len(table)} entries")
+        return table
+    
     def match(
         self, 
         text: str, 
@@ -189,92 +1201,179 @@ class RegexService:
         
         Returns:
             Dict包含intent, action, target, entities, domain等字段，如果未匹配返回None
+        
+        Note:
+            加载完成后 load_patterns 会把实例上的 match 绑定为 _match_loaded
+            （启用 REGEX_MATCH_CACHE_SIZE 时为 _match_with_cache），因此该方法只在规则加载前被调用。
         """
-        if not self._loaded:
-            logger.warning("Regex patterns not loaded, cannot match")
+        logger.warning("Regex patterns not loaded, cannot match")
+        return None
+    
+    def _match_loaded(
+        self, 
+        text: str, 
+        domain: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """规则加载完成后的 match 实现（省去每次调用时的加载状态检查），参数和返回值同 match"""
+        rule_set = self._dispatch.get(domain)
+        if rule_set is None:
+            rule_set = self._ensure_domain_loaded(domain)
+        if not rule_set.patterns:
+            # 没有任何可用规则（如未配置通用规则且领域规则为空），无需进入匹配流程
             return None
         
-        # 策略1: 全局正则匹配（domain=None）- 只匹配通用规则
-        if domain is None:
-            # 只匹配通用规则（不遍历领域规则）
-            if self.common_patterns:
-                result = self._match_patterns(text, self.common_patterns)
-                if result:
-                    # 优先使用规则配置中的domain，如果没有则使用"通用"
-                    if not result.get("domain"):
-                        result["domain"] = "通用"
-                    logger.debug(f"Matched common pattern (global regex), domain={result.get('domain')}")
-                    return result
-            
-            # 全局正则只匹配通用规则，不匹配领域规则
-            return None
+        matched = self._match_patterns(text, rule_set)
+        if matched is not None and matched[0] < rule_set.fallback_start:
+            result = matched[1]
+            if logger.isEnabledFor(logging.INFO):
+                # semantic 为字典或None
+                semantic = result["semantic"] or {}
+                logger.info(
+                    "Matched pattern in domain '%s': intent=%s, action=%s, target=%s",
+                    result["domain"], result["intent"], semantic.get("action"), semantic.get("target")
+                )
+            return result
         
-        # 策略2: 指定领域匹配
-        if domain in self.domain_patterns:
-            result = self._match_patterns(text, self.domain_patterns[domain])
-            if result:
-                # 优先使用规则配置中的domain，如果没有则使用传入的domain
-                if not result.get("domain"):
-                    result["domain"] = domain
-                semantic = result.get('semantic', {})
-                logger.info(f"Matched pattern in domain '{result.get('domain', domain)}': intent={result.get('intent')}, action={semantic.get('action') if isinstance(semantic, dict) else None}, target={semantic.get('target') if isinstance(semantic, dict) else None}")
-                return result
-            else:
-                logger.debug(f"No pattern matched in domain '{domain}' for text: {text}")
-        
-        # 如果指定领域匹配失败，尝试通用规则（兜底）
-        if self.common_patterns:
-            result = self._match_patterns(text, self.common_patterns)
-            if result:
-                # 优先使用规则配置中的domain，如果没有则使用"通用"
-                if not result.get("domain"):
-                    result["domain"] = "通用"
-                logger.debug(f"Matched common pattern (fallback), domain={result.get('domain')}")
-                return result
+        if rule_set.fallback_start:
+            logger.debug("No pattern matched in domain '%s' for text: %s", domain, text)
+        if matched is None:
+            return None
         
-        return None
+        result = matched[1]
+        if domain is None:
+            logger.debug("Matched common pattern (global regex), domain=%s", result["domain"])
+        else:
+            logger.debug("Matched common pattern (fallback), domain=%s", result["domain"])
+        return result
+    
+    def _match_with_cache(
+        self,
+        text: str,
+        domain: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """带结果缓存的 match 实现，返回缓存结果的副本，避免调用方修改缓存内容，参数和返回值同 match"""
+        result = self._match_cached(text, domain)
+        return _copy_result(result) if result else None
     
     def _match_patterns(
         self, 
         text: str, 
-        patterns: List[Dict[str, Any]]
-    ) -> Optional[Dict[str, Any]]:
+        rule_set: _RuleSet
+    ) -> Optional[Tuple[int, Dict[str, Any]]]:
         """
-        在给定的规则列表中匹配文本
+        在给定的规则组中匹配文本
+        
+        依次利用纯字面量查表和预过滤（Hyperscan 或字面量）缩小需要进入正则引擎的规则范围，
+        再用合并正则（可用时）一次完成匹配，否则逐条匹配。
         
         Args:
             text: 待匹配的文本
-            patterns: 规则列表
+            rule_set: 规则组
         
         Returns:
-            匹配结果，包含intent, action, target, entities等字段
+            (命中规则的下标, 匹配结果)，匹配结果包含intent, action, target, entities等字段；未命中返回None
         """
-        for pattern_config in patterns:
-            pattern = pattern_config.get("pattern")
-            if not pattern:
-                continue
-            
+        patterns = rule_set.patterns
+        literal_table = rule_set.literal_table
+        fused = rule_set.fused
+        prefilter = rule_set.prefilter
+        scanner = rule_set.scanner
+        
+        # 文本命中字面量查表时，只需检查排在该规则之前的规则，其余规则无需进入正则引擎
+        literal_hit = literal_table.get(text) if literal_table else None
+        limit = literal_hit[0] if literal_hit else len(patterns)
+        # 需要逐条匹配的规则下标（按规则顺序）
+        indices = range(limit)
+        
+        data = None
+        if scanner is not None and limit:
             try:
-                # 编译正则表达式以提高性能（可以考虑缓存）
-                match = re.search(pattern, text)
+                data = text.encode("utf-8")
+            except UnicodeEncodeError:
+                # 文本含孤立的代理字符，无法编码为 UTF-8，不使用 Hyperscan 预过滤
+                pass
+        
+        if data is not None:
+            # Hyperscan 预过滤：一次扫描得到可能命中的规则，再按规则顺序用 re 确认
+            database, always, local = scanner
+            scratch = getattr(local, "scratch", None)
+            if scratch is None:
+                scratch = local.scratch = hyperscan.Scratch(database)
+            matched = set(always)
+            database.scan(data, match_event_handler=_on_hyperscan_match, context=matched, scratch=scratch)
+            fused = None
+            indices = sorted(index for index in matched if index < limit)
+        elif prefilter is not None and limit:
+            # 字面量预过滤：只保留必须出现的字面量都在文本中的规则
+            automaton, required, always = prefilter
+            if automaton is not None:
+                # 一次扫描收集已满足的 (规则, 候选集合)，所有候选集合都满足的规则才是候选规则
+                satisfied = set()
+                for _, keys in automaton.iter(text):
+                    satisfied.update(keys)
+                counts: Dict[int, int] = {}
+                for index, _ in satisfied:
+                    counts[index] = counts.get(index, 0) + 1
+                candidates = sorted(
+                    [index for index, count in counts.items() if count == len(required[index]) and index < limit]
+                    + [index for index in always if index < limit]
+                )
+            else:
+                candidates = [
+                    index for index in indices
+                    if all(any(literal in text for literal in group) for group in required[index])
+                ]
+            if len(candidates) < limit:
+                # 部分规则已被排除，只对剩余规则逐条匹配
+                fused = None
+                indices = candidates
+        
+        if fused is not None:
+            if limit:
+                fused_pattern, spans = fused
+                match = fused_pattern.match(text)
                 if match:
-                    result = self._extract_result(pattern_config, match, text)
-                    semantic = result.get('semantic', {})
-                    logger.info(f"Regex matched: pattern={pattern[:100]}..., text={text}, intent={result.get('intent')}, action={semantic.get('action') if isinstance(semantic, dict) else None}, target={semantic.get('target') if isinstance(semantic, dict) else None}")
-                    return result
-                else:
+                    index, start, end = spans[match.lastindex]
+                    if index < limit:
+                        pattern_config = patterns[index]
+                        result = self._extract_result(pattern_config, match.groups()[start:end], text)
+                        self._log_match(pattern_config, result, text)
+                        return index, result
+        else:
+            # 循环中只访问各规则的 search 方法，命中后才取规则配置
+            searches = rule_set.searches
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+            for index in indices:
+                match = searches[index](text)
+                if match:
+                    pattern_config = patterns[index]
+                    result = self._extract_result(pattern_config, match.groups(), text)
+                    self._log_match(pattern_config, result, text)
+                    return index, result
+                elif debug_enabled:
                     # 只在调试模式下记录未匹配的规则，避免日志过多
-                    logger.debug(f"Regex not matched: pattern={pattern[:100]}..., text={text}")
-            except re.error as e:
-                logger.error(f"Invalid regex pattern '{pattern[:100]}...': {e}")
-                continue
+                    logger.debug("Regex not matched: pattern=%s..., text=%s", patterns[index].pattern_preview, text)
+        
+        if literal_hit:
+            logger.debug("Literal lookup matched: text=%s", text)
+            return literal_hit[0], _copy_result(literal_hit[1])
         
         return None
     
+    def _log_match(self, pattern_config: PatternEntry, result: Dict[str, Any], text: str):
+        """记录规则命中日志（仅在INFO级别启用时格式化）"""
+        if logger.isEnabledFor(logging.INFO):
+            semantic = result["semantic"] or {}
+            logger.info(
+                "Regex matched: pattern=%s..., text=%s, intent=%s, action=%s, target=%s",
+                pattern_config.pattern_preview, text, result["intent"],
+                semantic.get("action"), semantic.get("target")
+            )
+    
     def _extract_result(
         self,
-        pattern_config: Dict[str, Any],
-        match: re.Match,
+        pattern_config: PatternEntry,
+        groups: Tuple[Optional[str], ...],
         text: str
     ) -> Dict[str, Any]:
         """
@@ -282,70 +1381,51 @@ class RegexService:
         
         Args:
             pattern_config: 规则配置
-            match: 正则匹配对象
+            groups: 规则自身的分组匹配值（与单独匹配该规则时的 match.groups() 一致）
             text: 原始文本
         
         Returns:
             包含intent, action, target, position, value, confidence, entities, raw_text等字段的字典
         """
         # 获取基础配置
-        intent = pattern_config.get("intent", "unknown")
-        action = pattern_config.get("action")  # 从配置中读取action（如"open"）
-        target = pattern_config.get("target")  # 从配置中读取target（通常是null，从正则中提取）
-        domain = pattern_config.get("domain")  # 从配置中读取domain（如果规则中有定义）
-        confidence = pattern_config.get("confidence", 1.0)
+        intent = pattern_config.intent
+        action = pattern_config.action  # 从配置中读取action（如"open"）
+        target = pattern_config.target  # 从配置中读取target（通常是null，从正则中提取）
+        domain = pattern_config.domain  # 从配置中读取domain（如果规则中有定义）
+        confidence = pattern_config.confidence
         
-        # 提取命名分组
+        # 提取分组（命名分组优先，其余按 group_names 对应位置命名，映射在加载时已计算好）
+        # 只遍历有实体名的分组：命名分组未参与匹配（值为None）时不计入，
+        # 按位置命名的分组只记录非空值，同名时取第一个非空值
         entities = {}
-        if match.groupdict():
-            entities = match.groupdict()
-        
-        # 提取所有分组（包括非命名分组）
-        groups = match.groups()
-        if groups:
-            group_names = pattern_config.get("group_names", [])
-            for i, group_value in enumerate(groups):
-                if group_value and i < len(group_names):
-                    # 只有当entities中没有该key时才添加（避免覆盖命名分组）
-                    if group_names[i] not in entities:
-                        entities[group_names[i]] = group_value
-        
-        # 动态提取target、position、value（如果正则中有分组）
-        # action从配置中读取，不需要从entities中提取
-        if not target and "target" in entities:
-            target = entities.get("target")
-            # 将中文target映射为alias（如果vocab_manager可用）
-            if target and self.vocab_manager:
-                alias = self.vocab_manager.get_alias_by_item(target)
-                if alias:
-                    target = alias
-        
-        position = entities.get("position")  # 方位（可选）
-        # 将中文position映射为alias（如果vocab_manager可用）
-        if position and self.vocab_manager:
-            alias = self.vocab_manager.get_alias_by_item(position)
-            if alias:
-                position = alias
-        
-        value = entities.get("value")  # 值（可选）
-        # 将中文value映射为alias（如果vocab_manager可用）
-        if value and self.vocab_manager:
-            alias = self.vocab_manager.get_alias_by_item(value)
-            if alias:
-                value = alias
-        
-        logger.debug(f"Extracted result: intent={intent}, action={action}, target={target}, position={position}, entities={entities}")
-        
-        # 构建semantic对象（使用统一的工具函数，自动过滤None值）
-        semantic = build_semantic_dict(
-            action=action,
-            target=target,
-            position=position,
-            value=value
-        )
+        for index, name, positional in pattern_config.entity_slots:
+            value = groups[index]
+            if positional:
+                if value and name not in entities:
+                    entities[name] = value
+            elif value is not None:
+                entities[name] = value
         
-        # 过滤entities中的None值
-        filtered_entities = filter_none_values(entities)
+        # 规则既没有配置语义字段、也没有对应实体分组时，semantic必然为None，直接跳过构建
+        semantic = None
+        if pattern_config.has_semantic:
+            # 动态提取target、position、value（如果正则中有分组），配置了target时不再使用target实体
+            # action从配置中读取，不需要从entities中提取
+            values = {"target": target, "position": None, "value": None}
+            # 将实体中的中文词汇映射为alias（如果vocab_manager可用）
+            item_to_alias = self.vocab_manager.item_to_alias if self.vocab_manager else {}
+            for name in _SEMANTIC_ENTITY_NAMES:
+                if name in entities and (name != "target" or not target):
+                    item = entities[name]
+                    values[name] = (item and item_to_alias.get(item)) or item
+            
+            # 构建semantic对象（使用统一的工具函数，自动过滤None值）
+            semantic = build_semantic_dict(action=action, **values)
+        
+        logger.debug("Extracted result: intent=%s, semantic=%s, entities=%s", intent, semantic, entities)
+        
+        # entities构建时已跳过None值，空字典按约定返回None
+        filtered_entities = entities or None
         
         return {
             "intent": intent,
@@ -371,11 +1451,10 @@ class RegexService:
         domain_descriptions = {}
         try:
             if config_path.exists():
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    domain_examples = config.get("domain_examples", {})
-                    for domain, domain_data in domain_examples.items():
-                        domain_descriptions[domain] = domain_data.get("description", f"{domain}相关规则")
+                config = _read_json_file(config_path)
+                domain_examples = config.get("domain_examples", {})
+                for domain, domain_data in domain_examples.items():
+                    domain_descriptions[domain] = domain_data.get("description", f"{domain}相关规则")
         except Exception as e:
             logger.warning(f"Failed to read domain descriptions: {e}")
         
@@ -395,6 +1474,9 @@ class RegexService:
                 "patterns": []
             }
             
-            with open(domain_file, 'w', encoding='utf-8') as f:
-                json.dump(default_config, f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                domain_file.write_bytes(orjson.dumps(default_config, option=orjson.OPT_INDENT_2))
+            else:
+                with open(domain_file, 'w', encoding='utf-8') as f:
+                    json.dump(default_config, f, ensure_ascii=False, indent=2)
             logger.info(f"Created default regex config for domain '{domain}' at {domain_file}")
@@ -4,13 +4,21 @@
 """
 import json
 import re
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from pathlib import Path
 from app.core.config import settings
 from app.utils.logger import get_logger
 
+try:
+    import orjson  # 可选依赖：orjson，比标准库 json 更快的JSON解析
+except ImportError:
+    orjson = None
+
 logger = get_logger(__name__)
 
+# 词汇组引用 {{group_id}} / {{group_id:escaped}} / {{group_id:raw}}
+_TEMPLATE_RE = re.compile(r'\{\{([^}]+)\}\}')
+
 
 class VocabularyManager:
     """词汇组管理器类"""
@@ -19,7 +27,10 @@ class VocabularyManager:
         self.groups: Dict[str, Dict[str, any]] = {}  # 词汇组定义
         self.group_aliases: Dict[str, str] = {}  # 组别名映射（group_id -> alias）
         self.item_to_alias: Dict[str, str] = {}  # 词汇项到alias的反向映射（中文词汇 -> alias）
+        self.group_lookup: Dict[str, List[str]] = {}  # 词汇组ID及别名（配置中的aliases） -> 词汇列表
         self.compiled_patterns: Dict[str, str] = {}  # 编译后的正则模式缓存
+        self.expanded_groups: Dict[str, str] = {}  # 词汇组引用展开结果缓存（引用内容如 "action_open:raw" -> 分组正则）
+        self.group_patterns: Dict[Tuple[str, bool], str] = {}  # 词汇组正则模式缓存（(group_id, escape) -> 正则模式）
         self._loaded = False
     
     def load_vocabularies(self, config_path: Optional[Path] = None):
@@ -39,7 +50,8 @@ class VocabularyManager:
         
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+                # 安装了 orjson 时使用 orjson 解析
+                config = orjson.loads(f.read()) if orjson is not None else json.load(f)
                 
                 # 加载词汇组
                 groups = config.get("groups", {})
@@ -57,12 +69,19 @@ class VocabularyManager:
                     # 存储组别名映射
                     self.group_aliases[group_id] = alias
                     
+                    self.group_lookup[group_id] = items
+                    
                     # 建立词汇项到alias的反向映射
                     # 如果item已存在，不覆盖（保留更具体的映射，因为先加载的通常是更具体的组）
                     for item in items:
                         if item not in self.item_to_alias:
                             self.item_to_alias[item] = alias
                 
+                # 别名（aliases: 别名 -> group_id）指向同一个词汇列表，不覆盖已有的组ID
+                for alias_name, group_id in config.get("aliases", {}).items():
+                    if group_id in self.groups and alias_name not in self.group_lookup:
+                        self.group_lookup[alias_name] = self.groups[group_id]["items"]
+                
                 # 验证词汇组
                 self._validate_groups()
                 
@@ -85,16 +104,17 @@ class VocabularyManager:
         获取词汇组的所有词汇
         
         Args:
-            group_id: 词汇组ID
+            group_id: 词汇组ID或别名
             
         Returns:
             词汇列表，如果组不存在返回None
         """
-        if group_id not in self.groups:
+        items = self.group_lookup.get(group_id)
+        if items is None:
             logger.warning(f"Vocabulary group '{group_id}' not found")
             return None
         
-        return self.groups[group_id]["items"].copy()
+        return items.copy()
     
     def get_group_alias(self, group_id: str) -> Optional[str]:
         """
@@ -133,6 +153,11 @@ class VocabularyManager:
         Returns:
             正则表达式模式字符串，如果组不存在返回None
         """
+        cache_key = (group_id, escape)
+        cached = self.group_patterns.get(cache_key)
+        if cached is not None:
+            return cached
+        
         items = self.get_group(group_id)
         if not items:
             return None
@@ -146,6 +171,7 @@ class VocabularyManager:
         
         # 组合成正则表达式
         pattern = "|".join(items)
+        self.group_patterns[cache_key] = pattern
         return pattern
     
     def expand_pattern(self, pattern_template: str) -> str:
@@ -181,6 +207,11 @@ class VocabularyManager:
             full_match = match.group(0)
             content = match.group(1)  # 组ID或 group_id:escaped
             
+            # 不同模板经常引用相同的词汇组，展开结果按引用内容缓存
+            cached = self.expanded_groups.get(content)
+            if cached is not None:
+                return cached
+            
             # 解析参数
             if ":" in content:
                 group_id, mode = content.split(":", 1)
@@ -196,7 +227,9 @@ class VocabularyManager:
                 logger.warning(f"Group '{group_id}' not found in pattern template, keeping original: {full_match}")
                 return full_match
             
-            return f"({group_pattern})"
+            expanded_group = f"({group_pattern})"
+            self.expanded_groups[content] = expanded_group
+            return expanded_group
         
         # 匹配 {group_id} 简写格式（单大括号）
         def replace_simple_group(match):
@@ -210,7 +243,7 @@ class VocabularyManager:
             return f"({group_pattern})"
         
         # 先处理双大括号格式 {{...}}
-        result = re.sub(r'\{\{([^}]+)\}\}', replace_group, result)
+        result = _TEMPLATE_RE.sub(replace_group, result)
         
         # 再处理单大括号格式 {group_id}（避免与命名分组冲突，只在特定上下文中使用）
         # 注意：这里使用更保守的策略，只匹配明确的格式
@@ -226,6 +259,8 @@ class VocabularyManager:
     def clear_cache(self):
         """清空编译缓存"""
         self.compiled_patterns.clear()
+        self.expanded_groups.clear()
+        self.group_patterns.clear()
         logger.debug("Vocabulary pattern cache cleared")
     
     def _create_default_config(self, config_path: Path):
@@ -253,8 +288,11 @@ class VocabularyManager:
             }
         }
         
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(default_config, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            config_path.write_bytes(orjson.dumps(default_config, option=orjson.OPT_INDENT_2))
+        else:
+            with open(config_path, 'w', encoding='utf-8') as f:
+                json.dump(default_config, f, ensure_ascii=False, indent=2)
         
         logger.info(f"Created default vocabulary groups config at {config_path}")
         # 重新加载
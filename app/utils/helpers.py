@@ -42,16 +42,13 @@ def build_semantic_dict(
     Returns:
         过滤后的语义字典，如果所有字段都是 None，则返回 None
     """
+    # 构建时直接跳过 None 值，不再生成中间字典
     semantic = {
-        "action": action,
-        "target": target,
-        "position": position,
-        "value": value
+        name: field
+        for name, field in (("action", action), ("target", target), ("position", position), ("value", value))
+        if field is not None
     }
     
-    # 过滤 None 值
-    filtered = filter_none_values(semantic)
-    
     # 只有当至少有一个字段有值时才返回
-    return filtered if filtered else None
+    return semantic if semantic else None
 
@@ -1,10 +1,12 @@
 """
 日志配置模块
 """
+import atexit
 import logging
+import queue
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from app.core.config import settings
 
 
@@ -34,7 +36,6 @@ def setup_logger(name: str = "NXZ_NLU") -> logging.Logger:
     # 控制台输出
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
     
     # 文件输出
     log_dir = Path(settings.LOG_DIR)
@@ -47,7 +48,14 @@ def setup_logger(name: str = "NXZ_NLU") -> logging.Logger:
         encoding='utf-8'
     )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    
+    # 控制台和文件输出由后台线程完成，记录日志的线程只需将日志放入队列，不做同步I/O
+    log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, console_handler, file_handler)
+    listener.start()
+    # 进程退出时写完队列中剩余的日志
+    atexit.register(listener.stop)
     
     return logger
 
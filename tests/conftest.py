@@ -0,0 +1,44 @@
+"""
+测试公共夹具
+"""
+import httpx
+import pytest
+from app.services.regex_service import RegexService
+from app.services.vocabulary_manager import VocabularyManager
+
+
+@pytest.fixture(scope="session")
+def vocab_manager():
+    """整个测试会话共用的已加载词汇组管理器（只读取一次配置）"""
+    manager = VocabularyManager()
+    manager.load_vocabularies()
+    return manager
+
+
+@pytest.fixture(scope="session")
+def regex_service():
+    """整个测试会话共用的已加载正则服务（通用规则只加载编译一次，领域规则首次使用时加载）"""
+    service = RegexService()
+    service.load_patterns()
+    return service
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """异步测试使用的事件循环后端"""
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def client():
+    """整个测试会话共用的 API 异步客户端（通过 ASGI 直接调用应用，NLU服务只初始化一次）"""
+    # 应用依赖模型等较重的组件，只在 API 测试用到时才导入
+    from app.main import app
+    from app.api.dependencies import initialize_nlu_service
+    
+    # ASGITransport 不触发应用的启动事件，需要先初始化NLU服务
+    initialize_nlu_service()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as api_client:
+        # 预热：首次识别时加载领域规则，避免计入第一个测试
+        await api_client.post("/api/v1/nlu/intent", json={"text": "打开车窗"})
+        yield api_client
@@ -1,21 +1,33 @@
 #!/usr/bin/env python3
 # coding=utf-8
-import requests
+import atexit
+import httpx
 from pprint import pprint
 
+try:
+    import orjson  # 可选依赖：更快地格式化输出JSON（中文不转义）
+except ImportError:
+    orjson = None
+
+# 复用连接池，多次请求不再重复建立连接
+_CLIENT = httpx.Client(base_url="http://localhost:8000", timeout=5.0)
+atexit.register(_CLIENT.close)
+
 
 def demo():
-    domain_url = "http://localhost:8000/api/v1/nlu/domain"
-    intent_url = "http://localhost:8000/api/v1/nlu/intent"
-    resp = requests.post(intent_url, json={
+    domain_url = "/api/v1/nlu/domain"
+    intent_url = "/api/v1/nlu/intent"
+    resp = _CLIENT.post(intent_url, json={
         "text": "打开副驾的车窗",
         "context": {},
         "session_id": "session_123"
     })
     pprint(resp.content.decode("utf-8"))
-    pprint(resp.json())
+    if orjson is not None:
+        print(orjson.dumps(orjson.loads(resp.content), option=orjson.OPT_INDENT_2).decode("utf-8"))
+    else:
+        pprint(resp.json())
 
 
 if __name__ == '__main__':
     demo()
-
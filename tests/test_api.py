@@ -3,33 +3,28 @@ API测试
 """
 import pytest
 import requests
-from fastapi.testclient import TestClient
-from app.main import app
-from app.api.dependencies import initialize_nlu_service
 
-# 初始化NLU服务（在模块级别）
-initialize_nlu_service()
+# 所有测试在同一个事件循环中运行，共用会话级的 client 夹具（见 conftest.py）
+pytestmark = pytest.mark.anyio
 
-client = TestClient(app)
 
-
-def test_root():
+async def test_root(client):
     """测试根路径"""
-    response = client.get("/")
+    response = await client.get("/")
     assert response.status_code == 200
     assert "service" in response.json()
 
 
-def test_health_check():
+async def test_health_check(client):
     """测试健康检查"""
-    response = client.get("/health")
+    response = await client.get("/health")
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
 
 
-def test_intent_recognition():
+async def test_intent_recognition(client):
     """测试意图识别API"""
-    response = client.post(
+    response = await client.post(
         "/api/v1/nlu/intent",
         json={"text": "打开车窗"}
     )
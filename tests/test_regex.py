@@ -5,20 +5,358 @@ import pytest
 from app.services.regex_service import RegexService
 
 
-def test_regex_service_load():
+def test_regex_service_load(regex_service):
     """测试正则服务加载"""
+    assert regex_service._loaded is True
+
+
+def test_regex_match(regex_service):
+    """测试正则匹配"""
+    result = regex_service.match("打开车窗")
+    assert result is not None
+    assert result["intent"] == "vehicle_control"
+    assert result["action"] == "open"
+
+
+def test_domain_patterns_loaded_on_first_use():
+    """测试领域规则在首次匹配该领域时才加载"""
     service = RegexService()
     service.load_patterns()
-    assert service._loaded is True
+    assert "电话" in service._domain_files
+    assert "电话" not in service.domain_patterns
+    
+    service.match("接听电话", domain="电话")
+    assert "电话" in service.domain_patterns
+    assert service._ensure_domain_loaded("电话") is service._dispatch["电话"]
 
 
-def test_regex_match():
-    """测试正则匹配"""
+def test_literal_table_matches_regex_path(regex_service):
+    """测试纯字面量规则查表结果与正则匹配结果一致"""
+    text = "接听电话"
+    rule_set = regex_service._ensure_domain_loaded("电话")
+    index, template = rule_set.literal_table[text]
+    pattern_config = rule_set.patterns[index]
+    expected = regex_service._extract_result(pattern_config, pattern_config.compiled.search(text).groups(), text)
+    
+    assert template == expected
+    assert regex_service.match(text, domain="电话") == expected
+
+
+def test_factored_alternations_match_original_patterns(regex_service):
+    """测试合并公共前缀、压缩分组后的规则与原始规则在默认配置上的匹配结果一致"""
+    import re
+    from app.services.regex_service import _build_entity_slots, _compact_groups, _factor_alternations
+    
+    assert _factor_alternations("(?P<target>车窗|车门|天窗)") == "(?P<target>车[窗门]|天窗)"
+    assert _factor_alternations("(车|车窗)") == "(车窗??)"
+    compacted, slots = _compact_groups(re.compile(r"(打开)(主驾|[(]副驾)?(?P<target>车窗)"), ((2, "target", False),))
+    assert (compacted.pattern, slots) == (r"(?:打开)(?:主驾|[(]副驾)?(?P<target>车窗)", ((0, "target", False),))
+    compacted, slots = _compact_groups(re.compile(r"(打开)(?P<g2>开)"), ((1, "g2", False), (1, "y", True)))
+    assert (compacted.pattern, slots) == (r"(?:打开)(?P<g2>开)", ((0, "g2", False), (0, "y", True)))
+    
+    for domain in list(regex_service._domain_files):
+        regex_service._ensure_domain_loaded(domain)
+    
+    all_patterns = [p for patterns in regex_service.domain_patterns.values() for p in patterns]
+    all_patterns += regex_service.common_patterns
+    texts = ["打开车窗", "关闭主驾车门", "导航到公司", "播放下一首", "接听电话", "打开空调调到二十六度", "你好"]
+    for pattern_config in all_patterns:
+        original = re.compile(pattern_config.pattern)
+        original_slots = _build_entity_slots(original, pattern_config.group_names)
+        compiled = pattern_config.compiled
+        for text in texts:
+            expected = original.search(text)
+            actual = compiled.search(text)
+            # 比较匹配位置和各实体分组的值
+            assert (actual and (actual.span(), [(name, actual.groups()[index]) for index, name, _ in pattern_config.entity_slots])) == (
+                expected and (expected.span(), [(name, expected.groups()[index]) for index, name, _ in original_slots])
+            )
+
+
+def test_positional_entities_skip_empty_values(regex_service):
+    """测试按位置命名的分组只记录非空值，命名分组记录所有参与匹配的值，命名分组同时保留按位置的名称"""
+    patterns = regex_service._expand_patterns([
+        {"pattern": r"(打开)(左|)(车窗)", "intent": "vehicle_control", "group_names": ["action", "position", "target"]},
+        {"pattern": r"(a|ab)(c|bcd)(d*)", "intent": "letters", "group_names": ["x", "y", "z"]},
+        {"pattern": r"(?P<value>\d*)度", "intent": "temperature"},
+        {"pattern": r"(?P<g2>开)", "intent": "alias", "group_names": ["y"]},
+    ], default_domain="车控")
+    rule_set = regex_service._build_rule_set(patterns, len(patterns))
+    
+    assert regex_service._match_patterns("打开车窗", rule_set)[1]["entities"] == {"action": "打开", "target": "车窗"}
+    assert regex_service._match_patterns("abcd", rule_set)[1]["entities"] == {"x": "a", "y": "bcd"}
+    assert regex_service._match_patterns("度", rule_set)[1]["entities"] == {"value": ""}
+    assert regex_service._match_patterns("开", rule_set)[1]["entities"] == {"g2": "开", "y": "开"}
+
+
+def test_cached_match_returns_copies(regex_service):
+    """测试重复匹配命中缓存时，修改返回结果不会影响后续匹配"""
+    first = regex_service.match("打开车窗", domain="车控")
+    first["entities"].clear()
+    first["semantic"]["action"] = "changed"
+    
+    second = regex_service.match("打开车窗", domain="车控")
+    assert second is not first
+    assert second["semantic"]["action"] == "open"
+    assert second["entities"] == {"action": "打开", "target": "车窗"}
+
+
+def test_read_json_file_reuses_unchanged_files(tmp_path):
+    """测试未修改的配置文件直接复用解析结果，修改后重新解析"""
+    import os
+    from app.services.regex_service import _read_json_file
+    
+    path = tmp_path / "rules.json"
+    path.write_text('{"patterns": []}', encoding="utf-8")
+    first = _read_json_file(path)
+    assert _read_json_file(path) is first
+    
+    path.write_text('{"patterns": [{"pattern": "你好"}]}', encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert _read_json_file(path)["patterns"] == [{"pattern": "你好"}]
+
+
+def test_warn_backtracking():
+    """测试灾难性回溯结构的静态检查"""
+    from app.services.regex_service import _warn_backtracking
+    
+    assert _warn_backtracking("(a+)+b")
+    assert _warn_backtracking("(打开|打)+车窗")
+    assert _warn_backtracking("(?P<target>.+)的(?P<value>.*)")
+    assert not _warn_backtracking("导航(到|去)(?P<target>.+)")
+    assert not _warn_backtracking("(?P<position>(?:(主驾|副驾)|(后排)))?(?P<target>车窗)")
+
+
+def test_required_literals_skip_escape_payloads(regex_service):
+    """测试提取必需字面量时跳过整个转义序列，转义写法的规则不会被预过滤排除"""
+    from app.services.regex_service import _extract_required_literals
+    
+    assert _extract_required_literals(r"\x41BC(?P<target>\d+)") == {frozenset({"BC"})}
+    assert _extract_required_literals(r"\u6253\u5f00(?P<target>天窗)") == set()
+    assert _extract_required_literals(r"\U00006253开") == {frozenset({"开"})}
+    assert _extract_required_literals(r"\N{DIGIT ONE}号") == {frozenset({"号"})}
+    assert _extract_required_literals(r"\p{Han}车窗") == {frozenset({"车窗"})}
+    assert _extract_required_literals(r"\101BC") == {frozenset({"BC"})}
+    
+    patterns = regex_service._expand_patterns([
+        {"pattern": r"\u6253\u5f00(?P<target>天窗)", "intent": "vehicle_control", "action": "open"},
+        {"pattern": r"\x41BC(?P<target>\d+)", "intent": "code"},
+        {"pattern": r"(?P<target>.+)", "intent": "fallback"},
+    ], default_domain="车控")
+    rule_set = regex_service._build_rule_set(patterns, len(patterns))
+    assert regex_service._match_patterns("打开天窗", rule_set)[0] == 0
+    assert regex_service._match_patterns("ABC12", rule_set)[0] == 1
+
+
+def _load_rules(tmp_path, monkeypatch, domain_rules, common_rules=(), hyperscan_prefilter=False, cache_size=0):
+    """用临时规则配置创建正则服务（domain_rules: 领域 -> 规则列表），默认不启用结果缓存和 Hyperscan 预过滤"""
+    import json
+    from app.core.config import settings
+    
+    domain_dir = tmp_path / "regex"
+    domain_dir.mkdir()
+    for domain, rules in domain_rules.items():
+        (domain_dir / f"{domain}.json").write_text(json.dumps({"patterns": rules}, ensure_ascii=False), encoding="utf-8")
+    common_path = tmp_path / "regex_patterns.json"
+    common_path.write_text(json.dumps({"patterns": list(common_rules)}, ensure_ascii=False), encoding="utf-8")
+    
+    monkeypatch.setattr(settings, "REGEX_DOMAIN_DIR", str(domain_dir))
+    monkeypatch.setattr(settings, "REGEX_CONFIG_PATH", str(common_path))
+    monkeypatch.setattr(settings, "REGEX_MATCH_CACHE_SIZE", cache_size)
+    monkeypatch.setattr(settings, "REGEX_HYPERSCAN_PREFILTER", hyperscan_prefilter)
     service = RegexService()
     service.load_patterns()
+    return service
+
+
+def _search_rules(service, rule_set, text):
+    """逐条 search 得到的匹配结果（用作比较基准），参数和返回值同 _match_patterns"""
+    for index, pattern_config in enumerate(rule_set.patterns):
+        match = pattern_config.compiled.search(text)
+        if match:
+            return index, service._extract_result(pattern_config, match.groups(), text)
+    return None
+
+
+def test_fused_pattern_keeps_rule_order(tmp_path, monkeypatch):
+    """测试合并正则按规则顺序取第一条命中的规则，含反向引用、条件分组或内联标志的规则组回退为逐条匹配"""
+    from app.services import regex_service as regex_module
     
-    result = service.match("打开车窗")
-    assert result is not None
-    assert result["intent"] == "vehicle_control"
-    assert result["action"] == "open"
+    # 不构建字面量预过滤，确保匹配走合并正则
+    monkeypatch.setattr(regex_module, "ahocorasick", None)
+    service = _load_rules(tmp_path, monkeypatch, {
+        "车控": [
+            {"pattern": "(?P<target>车窗)", "intent": "first"},
+            {"pattern": "(?P<action>打开|关闭)", "intent": "second"},
+        ],
+        "电话": [
+            {"pattern": "(?i)call (?P<target>\\w+)", "intent": "call"},
+            {"pattern": "(重)\\1拨", "intent": "redial"},
+            {"pattern": "拨打(?P<target>.+)", "intent": "dial"},
+        ],
+        "导航": [
+            {"pattern": "(?P<target>x)", "intent": "first"},
+            {"pattern": "(a)?(?(1)b|c)", "intent": "conditional"},
+        ],
+    }, common_rules=[{"pattern": "(?P<target>.+)", "intent": "fallback"}])
+    
+    rule_set = service._ensure_domain_loaded("车控")
+    assert rule_set.fused is not None
+    # 后一条规则在文本中更靠前的位置命中，仍然以前一条规则为准
+    for text in ["打开车窗", "关闭天窗", "你好", ""]:
+        assert service._match_patterns(text, rule_set) == _search_rules(service, rule_set, text)
+    assert service.match("打开车窗", domain="车控")["intent"] == "first"
+    assert service.match("关闭天窗", domain="车控")["intent"] == "second"
+    
+    # 含内联标志或反向引用的规则不合并，逐条匹配
+    rule_set = service._ensure_domain_loaded("电话")
+    assert rule_set.fused is None
+    for text in ["CALL mom", "重重拨", "拨打妈妈", "重拨", "你好"]:
+        assert service._match_patterns(text, rule_set) == _search_rules(service, rule_set, text)
+    assert service.match("CALL mom", domain="电话")["intent"] == "call"
+    assert service.match("重重拨", domain="电话")["intent"] == "redial"
+    
+    # 条件分组按编号引用分组，同样不合并
+    rule_set = service._ensure_domain_loaded("导航")
+    assert rule_set.fused is None
+    for text in ["ab", "c", "x", "b"]:
+        assert service._match_patterns(text, rule_set) == _search_rules(service, rule_set, text)
+    assert service.match("ab", domain="导航")["intent"] == "conditional"
+
 
+@pytest.mark.parametrize("use_automaton", [True, False])
+def test_literal_prefilter_matches_rule_search(tmp_path, monkeypatch, use_automaton):
+    """测试字面量预过滤（Aho-Corasick 自动机和逐个 in 判断）选出的规则与逐条 search 的结果一致"""
+    from app.services import regex_service as regex_module
+    
+    if use_automaton and regex_module.ahocorasick is None:
+        pytest.skip("pyahocorasick is not installed")
+    if not use_automaton:
+        monkeypatch.setattr(regex_module, "ahocorasick", None)
+    # 不使用合并正则，结果完全由预过滤选出的候选规则决定
+    monkeypatch.setattr(regex_module, "_build_fused_pattern", lambda patterns: None)
+    service = _load_rules(tmp_path, monkeypatch, {
+        "车控": [
+            {"pattern": "\\u6253\\u5f00(?P<target>天窗)", "intent": "escaped"},
+            {"pattern": "\\x41BC(?P<value>\\d+)", "intent": "escaped"},
+            {"pattern": "(打开|开启)(?P<target>车窗|车门)", "intent": "any_of"},
+            {"pattern": "(请|麻烦)?关闭(?P<target>空调)", "intent": "optional"},
+            {"pattern": "(帮我|给我){0,2}播放(?P<target>音乐)", "intent": "optional"},
+            {"pattern": "打开(?P<target>后备箱)", "intent": "required"},
+            {"pattern": "(?P<value>\\d+)度", "intent": "temperature"},
+            {"pattern": "26度", "intent": "literal"},
+            {"pattern": "(接听|拒接)电话", "intent": "literal"},
+        ],
+    }, common_rules=[{"pattern": "(?P<target>.+)", "intent": "fallback"}])
+    
+    rule_set = service._ensure_domain_loaded("车控")
+    automaton, required, always = rule_set.prefilter
+    assert (automaton is not None) == use_automaton
+    assert required[2] == frozenset({frozenset({"打开", "开启"}), frozenset({"车窗", "车门"})})
+    assert required[3] == frozenset({frozenset({"关闭"})})
+    assert required[4] == frozenset({frozenset({"播放"})})
+    # 纯字面量规则命中查表时，只检查排在它之前的规则（"26度" 由前面的温度规则命中）
+    assert rule_set.literal_table["26度"][0] == 7
+    assert "接听电话" in rule_set.literal_table
+    
+    texts = [
+        "打开天窗", "ABC12", "开启车门", "打开车窗", "请关闭空调", "关闭空调", "帮我帮我播放音乐", "播放音乐",
+        "打开后备箱", "26度", "接听电话", "拒接电话", "开车门", "随便说点什么", "",
+    ]
+    for text in texts:
+        assert service._match_patterns(text, rule_set) == _search_rules(service, rule_set, text), text
+    assert service.match("26度", domain="车控")["intent"] == "temperature"
+    assert service.match("接听电话", domain="车控")["intent"] == "literal"
+
+
+def test_hyperscan_prefilter_matches_rule_search(tmp_path, monkeypatch):
+    """测试 Hyperscan 预过滤不会排除 re 能匹配的规则（含语义与 re 不同的结构、无法编码为 UTF-8 的文本）"""
+    pytest.importorskip("hyperscan")
+    service = _load_rules(tmp_path, monkeypatch, {
+        "车控": [
+            {"pattern": "a{,2}b", "intent": "brace"},
+            {"pattern": "x\\sy", "intent": "space"},
+            {"pattern": "(?<=打)开(?P<target>车窗)", "intent": "lookbehind"},
+            {"pattern": "(?P<value>\\d+)度", "intent": "temperature"},
+            {"pattern": "打开(?P<target>车窗)", "intent": "open"},
+            {"pattern": "a{,3}", "intent": "empty"},
+        ],
+    }, hyperscan_prefilter=True)
+    
+    rule_set = service._ensure_domain_loaded("车控")
+    assert rule_set.scanner is not None
+    # 语义与 re 不同的规则始终作为候选
+    assert {0, 1, 2, 5} <= rule_set.scanner[1]
+    for text in ["ab", "aa", "x\x1cy", "打开车窗", "26度", "你好", "打开\ud800车窗"]:
+        assert service._match_patterns(text, rule_set) == _search_rules(service, rule_set, text), text
+    assert service.match("ab", domain="车控")["intent"] == "brace"
+    assert service.match("x\x1cy", domain="车控")["intent"] == "space"
+
+
+@pytest.mark.parametrize("engine", ["regex", "re2"])
+def test_regex_engine_matches_rule_search(tmp_path, monkeypatch, engine):
+    """测试使用 regex、re2 引擎时的匹配结果与逐条 search 一致（re2 不合并规则，不支持的规则回退到 re）"""
+    import re
+    from app.core.config import settings
+    from app.services import regex_service as regex_module
+    
+    module = pytest.importorskip(engine)
+    monkeypatch.setattr(settings, "REGEX_ENGINE", engine)
+    assert regex_module._select_regex_engine() is module
+    monkeypatch.setattr(regex_module, "re_mod", module)
+    service = _load_rules(tmp_path, monkeypatch, {
+        "车控": [
+            {"pattern": "(打开|开启)(?P<target>车窗|车门)", "intent": "vehicle_control"},
+            {"pattern": "(?P<value>\\d+)度", "intent": "temperature"},
+            {"pattern": "导航(?=到)(?P<target>.+)", "intent": "navigation"},
+        ],
+    }, common_rules=[{"pattern": "(?P<target>.+)", "intent": "fallback"}])
+    
+    rule_set = service._ensure_domain_loaded("车控")
+    assert not isinstance(rule_set.patterns[0].compiled, re.Pattern)
+    if engine == "re2":
+        assert rule_set.fused is None
+        # RE2 不支持前瞻，该规则回退到 re 编译
+        assert isinstance(rule_set.patterns[2].compiled, re.Pattern)
+    else:
+        assert rule_set.fused is not None
+    for text in ["打开车窗", "开启车门", "26度", "导航到公司", "你好", ""]:
+        assert service._match_patterns(text, rule_set) == _search_rules(service, rule_set, text), text
+    assert service.match("导航到公司", domain="车控")["intent"] == "navigation"
+
+
+@pytest.mark.parametrize("engine", ["regex", "re2"])
+def test_regex_engine_falls_back_to_re(monkeypatch, engine):
+    """测试配置的正则引擎模块未安装时回退到标准库 re"""
+    import re
+    from app.core.config import settings
+    from app.services import regex_service as regex_module
+    
+    monkeypatch.setattr(settings, "REGEX_ENGINE", engine)
+    monkeypatch.setattr(regex_module, engine, None)
+    assert regex_module._select_regex_engine() is re
+
+
+def test_reload_patterns_clears_match_cache(tmp_path, monkeypatch):
+    """测试重新加载规则后不会返回缓存中按旧规则得到的匹配结果"""
+    import json
+    import os
+    
+    service = _load_rules(tmp_path, monkeypatch, {
+        "车控": [{"pattern": "打开(?P<target>车窗)", "intent": "old"}],
+    }, common_rules=[{"pattern": "你好", "intent": "old"}], cache_size=16)
+    assert service.match("打开车窗", domain="车控")["intent"] == "old"
+    assert service.match("你好")["intent"] == "old"
+    
+    for path, rules in [
+        (tmp_path / "regex" / "车控.json", [{"pattern": "打开(?P<target>车窗)", "intent": "new"}]),
+        (tmp_path / "regex_patterns.json", [{"pattern": "你好", "intent": "new"}]),
+    ]:
+        path.write_text(json.dumps({"patterns": rules}, ensure_ascii=False), encoding="utf-8")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    service.reload_patterns()
+    
+    assert service.match("打开车窗", domain="车控")["intent"] == "new"
+    assert service.match("你好")["intent"] == "new"
@@ -6,22 +6,16 @@ from app.services.vocabulary_manager import VocabularyManager
 from pathlib import Path
 
 
-def test_vocabulary_manager_load():
+def test_vocabulary_manager_load(vocab_manager):
     """测试词汇组管理器加载"""
-    manager = VocabularyManager()
-    manager.load_vocabularies()
-    
-    assert manager._loaded is True
-    assert len(manager.groups) > 0
-    assert "action_open" in manager.groups
+    assert vocab_manager._loaded is True
+    assert len(vocab_manager.groups) > 0
+    assert "action_open" in vocab_manager.groups
 
 
-def test_get_group():
+def test_get_group(vocab_manager):
     """测试获取词汇组"""
-    manager = VocabularyManager()
-    manager.load_vocabularies()
-    
-    items = manager.get_group("action_open")
+    items = vocab_manager.get_group("action_open")
     assert items is not None
     assert "打开" in items
     assert "开启" in items
@@ -29,84 +23,67 @@ def test_get_group():
 
 def test_get_group_pattern():
     """测试获取词汇组正则模式"""
-    manager = VocabularyManager()
-    manager.load_vocabularies()
-    
-    pattern = manager.get_group_pattern("action_open")
+    # 测试会清空缓存，使用单独的实例，不影响会话共用的词汇组管理器
+    vocab_manager = VocabularyManager()
+    vocab_manager.load_vocabularies()
+    pattern = vocab_manager.get_group_pattern("action_open")
     assert pattern is not None
     assert "打开" in pattern or "\\u6253\\u5f00" in pattern  # 转义后的字符
+    
+    # 重复获取直接返回缓存结果，清空缓存后重新生成
+    assert vocab_manager.get_group_pattern("action_open") is pattern
+    vocab_manager.clear_cache()
+    assert vocab_manager.get_group_pattern("action_open") == pattern
 
 
-def test_expand_pattern():
+def test_expand_pattern(vocab_manager):
     """测试展开模式模板"""
-    manager = VocabularyManager()
-    manager.load_vocabularies()
-    
     # 测试简单展开
     template = "{{action_open}}{{target_window}}"
-    expanded = manager.expand_pattern(template)
+    expanded = vocab_manager.expand_pattern(template)
     
     assert expanded != template
     assert "(" in expanded  # 应该包含分组
     assert ")" in expanded
 
 
-def test_expand_pattern_with_named_group():
+def test_expand_pattern_with_named_group(vocab_manager):
     """测试包含命名分组的模式展开"""
-    manager = VocabularyManager()
-    manager.load_vocabularies()
-    
     template = "{{action_open}}(?P<target>{{target_window}})"
-    expanded = manager.expand_pattern(template)
+    expanded = vocab_manager.expand_pattern(template)
     
     assert "(?P<target>" in expanded
     assert "打开" in expanded or "开启" in expanded
 
 
-def test_expand_pattern_backward_compatible():
+def test_expand_pattern_backward_compatible(vocab_manager):
     """测试向后兼容性（不使用词汇组的模式）"""
-    manager = VocabularyManager()
-    manager.load_vocabularies()
-    
     # 没有词汇组引用的模式应该保持不变
     template = "(打开|开启)(车窗|车门)"
-    expanded = manager.expand_pattern(template)
+    expanded = vocab_manager.expand_pattern(template)
     
     assert expanded == template
 
 
-def test_alias():
+def test_alias(vocab_manager):
     """测试别名功能"""
-    manager = VocabularyManager()
-    manager.load_vocabularies()
-    
     # 使用别名获取组
-    items_by_alias = manager.get_group("打开")  # 通过别名
-    items_by_id = manager.get_group("action_open")  # 通过ID
+    items_by_alias = vocab_manager.get_group("打开")  # 通过别名
+    items_by_id = vocab_manager.get_group("action_open")  # 通过ID
     
     assert items_by_alias == items_by_id
 
 
-def test_integration_regex_service():
+def test_integration_regex_service(regex_service):
     """测试与RegexService的集成"""
-    from app.services.regex_service import RegexService
-    
-    service = RegexService()
-    service.load_patterns()
-    
-    assert service.vocab_manager is not None
-    assert service.vocab_manager._loaded is True
+    assert regex_service.vocab_manager is not None
+    assert regex_service.vocab_manager._loaded is True
 
 
-def test_match_with_vocabulary_groups():
+def test_match_with_vocabulary_groups(regex_service):
     """测试使用词汇组的规则匹配"""
-    from app.services.regex_service import RegexService
-    
-    service = RegexService()
-    service.load_patterns()
-    
     # 测试匹配
-    result = service.match("打开主驾驶车窗", domain="车控")
+    result = regex_service.match("打开主驾驶车窗", domain="车控")
     
     if result:
         assert result["intent"] == "vehicle_control"